@@ -1,30 +1,25 @@
+import time
+
+_SCRIPT_T0 = time.perf_counter()  # 起動計測（import 込み）
+
 import streamlit as st
 import json
 import base64
 from datetime import datetime, timedelta
-from PIL import Image
 import io
 import uuid
 import inspect
 import re
 from pathlib import Path
 import threading
+import os
+import hashlib
+import math
+import copy
+from collections import OrderedDict
 from contextlib import contextmanager
 
-# 依存（未インストールでも動作継続）
-# ドラッグ＆ドロップ: streamlit-sortables（任意）
-try:
-    from streamlit_sortables import sort_items
-    SORTABLE_AVAILABLE = True
-except Exception:
-    SORTABLE_AVAILABLE = False
-
-# サムネイルクリック: streamlit-extras（任意）
-try:
-    from streamlit_extras.clickable_images import clickable_images
-    CLICKABLE_AVAILABLE = True
-except Exception:
-    CLICKABLE_AVAILABLE = False
+_IMPORT_DONE = time.perf_counter()
 
 # ページ設定
 st.set_page_config(
@@ -35,8 +30,8 @@ st.set_page_config(
 )
 
 # CSS（曜日ヘッダ上/追加ボタン直下/カードすぐ下、D&Dは横スクロールで必ず見える）
-st.markdown(
-    """
+# 静的なので一度だけ組み立て、毎リランでは同じ文字列をそのまま送る
+APP_CSS = """
 <style>
 :root { --fg:#1f2937; --muted:#6b7280; --border:#e5e7eb; --bg:#f8fafc; }
 .main-header { text-align:center; color:var(--fg); margin: 0 0 1.0rem 0; }
@@ -47,9 +42,12 @@ st.markdown(
 .week-header h2 { margin:0; font-size: 1.1rem; font-weight:700; letter-spacing: 0.3px; }
 
 /* 曜日ヘッダ（最上部） */
-.dc-head { display:flex; justify-content:space-between; align-items:center; padding:.55rem .8rem; color:#fff; font-weight:700; border-radius:10px; }
+.dc-head { display:flex; flex-wrap:wrap; justify-content:space-between; align-items:center; padding:.55rem .8rem; color:#fff; font-weight:700; border-radius:10px; }
 .dc-name { font-size:.98rem; letter-spacing:.3px; }
 .dc-date { font-size:.9rem; opacity:.9; }
+.dc-load { flex-basis:100%; font-size:.78rem; opacity:.95; margin-top:.3rem; text-align:right; }
+.dc-head.overloaded { box-shadow: inset 0 0 0 3px #dc2626; }
+.dc-head.overloaded .dc-load { font-weight:800; }
 
 /* 曜日カラー */
 .day-head-0 { background: linear-gradient(135deg,#60a5fa,#3b82f6); } /* 月 */
@@ -81,6 +79,7 @@ st.markdown(
 .priority-medium { background-color: #fed7aa; color: #ea580c; }
 .priority-low { background-color: #bbf7d0; color: #059669; }
 .desc { font-size: 0.88rem; color:#374151; line-height: 1.45; margin-top: 0.2rem; }
+.task-meta { font-size: 0.75rem; color: var(--muted); margin-top: 0.1rem; }
 .label-tag { display:inline-block; background: #e0e7ff; color: #3730a3; padding: 2px 8px; border-radius: 9999px; font-size: 0.72rem; margin: 2px 4px 0 0; }
 
 /* D&Dボード（横スクロール可能にして小画面でも必ず見える） */
@@ -88,35 +87,628 @@ st.markdown(
 .dnd-scroll { overflow-x:auto; overflow-y:hidden; white-space: nowrap; }
 .dnd-caption { color: var(--muted); font-size: .85rem; margin-top: .25rem; }
 </style>
-""",
-    unsafe_allow_html=True,
-)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# D&Dボードのスタイル（各コンテナを「inline-block + 固定幅」にして横並び、横スクロール可能に）
+SORTABLE_CONTAINER_WIDTH = 220  # px
+SORTABLE_CONTAINER_STYLE = {
+    "display": "inline-block",
+    "verticalAlign": "top",
+    "width": f"{SORTABLE_CONTAINER_WIDTH}px",
+    "minWidth": f"{SORTABLE_CONTAINER_WIDTH}px",
+    "minHeight": "160px",
+    "backgroundColor": "#f8fafc",
+    "border": "2px dashed #e2e8f0",
+    "borderRadius": "10px",
+    "padding": "8px",
+    "margin": "6px",
+}
+SORTABLE_ITEM_STYLE = {
+    "padding": "6px 10px",
+    "margin": "4px 0",
+    "backgroundColor": "#fff",
+    "border": "1px solid #e5e7eb",
+    "borderRadius": "8px",
+    "cursor": "grab",
+    "whiteSpace": "normal",
+}
+
+# サムネイル（clickable_images）のスタイル
+THUMB_DIV_STYLE = {"display": "inline-block", "padding": "2px"}
+THUMB_IMG_STYLE = {
+    "margin": "4px",
+    "height": "110px",
+    "border": "1px solid #e5e7eb",
+    "border-radius": "6px",
+}
+
+
+# 依存（未インストールでも動作継続）
+# import とシグネチャ判定はプロセスにつき一度だけ行い、結果を使い回す
+@st.cache_resource(show_spinner=False)
+def probe_optional_components():
+    components = {
+        "sort_items": None,
+        "sortable_style_kwargs": {},
+        "clickable_images": None,
+        "import_ms": {},
+    }
+
+    # ドラッグ＆ドロップ: streamlit-sortables（任意）
+    t0 = time.perf_counter()
+    try:
+        from streamlit_sortables import sort_items
+
+        components["sort_items"] = sort_items
+        try:
+            params = inspect.signature(sort_items).parameters
+            if "styles" in params:
+                components["sortable_style_kwargs"] = {
+                    "styles": {"container": SORTABLE_CONTAINER_STYLE, "item": SORTABLE_ITEM_STYLE}
+                }
+            elif "container_style" in params and "item_style" in params:
+                components["sortable_style_kwargs"] = {
+                    "container_style": SORTABLE_CONTAINER_STYLE,
+                    "item_style": SORTABLE_ITEM_STYLE,
+                }
+        except Exception:
+            pass
+    except Exception:
+        pass
+    components["import_ms"]["streamlit_sortables"] = (time.perf_counter() - t0) * 1000
+
+    # サムネイルクリック: streamlit-extras（任意）
+    t0 = time.perf_counter()
+    try:
+        from streamlit_extras.clickable_images import clickable_images
+
+        components["clickable_images"] = clickable_images
+    except Exception:
+        pass
+    components["import_ms"]["streamlit_extras"] = (time.perf_counter() - t0) * 1000
+
+    return components
+
+
+_COMPONENTS = probe_optional_components()
+SORTABLE_AVAILABLE = _COMPONENTS["sort_items"] is not None
+CLICKABLE_AVAILABLE = _COMPONENTS["clickable_images"] is not None
+
+# 永続化（ISO週ごとのシャードに分割: tasks_store/2025-W07.json）
+# セッションは表示中の週だけを読み込み、前後の週はバックグラウンドで先読みする
+# ボードごとに保存先を分ける（default は tasks_store/、その他は tasks_store/boards/<name>/）
+DATA_FILE = Path("tasks_store.json")  # 旧形式（単一ファイル）。初回起動時に default ボードへ移行
+DATA_DIR = Path("tasks_store")
+BOARDS_DIR = DATA_DIR / "boards"
+DEFAULT_BOARD = "default"
+BOARD_NAME_PATTERN = re.compile(r"^[0-9A-Za-z_-]{1,40}$")
+INDEX_FILE_NAME = "_index.json"  # 週ごとの件数（統計用）
+MIGRATING_FILE_NAME = "_migrating"  # 旧形式からの移行中の印（途中で落ちたら次回やり直す）
+UNDATED_WEEK_KEY = "undated"
+WEEK_CACHE_MAX_BYTES = 64 * 1024 * 1024  # プロセス全体の週キャッシュの上限（添付画像込み、全ボード合計）
+SESSION_MAX_WEEKS = 5  # セッションが保持する週数の上限（表示週と前後の週は常に保持）
+WATCH_INTERVAL_SEC = 2.0  # 外部変更（他セッション・スクリプト・バックアップ復元）の確認間隔
+
+
+def week_key_for_date(d):
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_key_for_date_str(date_str):
+    try:
+        return week_key_for_date(datetime.strptime(date_str, "%Y-%m-%d").date())
+    except Exception:
+        return UNDATED_WEEK_KEY
+
 
-# 永続化
-DATA_FILE = Path("tasks_store.json")
-_PERSIST_LOCK = threading.Lock()
+TASK_PRIORITIES = ("low", "medium", "high")
 
 
-def load_tasks_from_disk():
-    if DATA_FILE.exists():
+def normalize_task_dict(d):
+    """シャードの1レコードを検査し、欠けた項目を既定値で補った dict を返す（使えないレコードは None）。
+
+    外部で編集されたファイルも読み込むので、id・title・date が揃わない、添付の形が崩れている等は不正とする。
+    """
+    if not isinstance(d, dict):
+        return None
+    if not (isinstance(d.get("id"), str) and d["id"]) or not isinstance(d.get("title"), str):
+        return None
+    if not isinstance(d.get("date"), str):
+        return None
+    description = d.get("description") or ""
+    labels = d.get("labels") or []
+    attachments = d.get("attachments") or []
+    if not isinstance(description, str) or not isinstance(labels, list) or not isinstance(attachments, list):
+        return None
+    for att in attachments:
+        if not isinstance(att, dict) or not all(isinstance(att.get(k), str) for k in ("id", "name", "type", "data")):
+            return None
+    priority = d.get("priority")
+    return dict(
+        d,
+        description=description,
+        priority=priority if priority in TASK_PRIORITIES else "medium",
+        labels=[str(lb) for lb in labels],
+        attachments=attachments,
+    )
+
+
+class CacheBudget:
+    """全ボードの週キャッシュで共有するバイト数の上限。キャッシュを持っているボードの間で等分する。"""
+
+    def __init__(self, max_bytes=WEEK_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stores = []
+
+    def register(self, store):
+        with self._lock:
+            self._stores.append(store)
+
+    def share(self, requester=None):
+        with self._lock:
+            stores = list(self._stores)
+        active = sum(1 for s in stores if s is requester or s.cache_bytes > 0)
+        return self.max_bytes // max(1, active)
+
+    def rebalance(self):
+        # 各ストアは自分のロックだけを取って縮めるので、ストアのロックを持ったまま呼ばないこと
+        with self._lock:
+            stores = list(self._stores)
+        cap = self.share()
+        for store in stores:
+            store.shrink_to(cap)
+
+
+class WeekShardStore:
+    """週シャードの読み書きと、プロセス内で共有する LRU キャッシュ。"""
+
+    def __init__(self, data_dir, legacy_file=None, max_cache_bytes=WEEK_CACHE_MAX_BYTES, budget=None):
+        self.data_dir = Path(data_dir)
+        self.max_cache_bytes = max_cache_bytes
+        self._budget = budget
+        self._write_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache = OrderedDict()  # week_key -> (task_dicts, nbytes)
+        self._cache_bytes = 0
+        self._generation = {}  # week_key -> 書き込み回数（先読みとの競合検出用）
+        self._inflight = {}  # week_key -> threading.Event
+        self._signatures = {}  # week_key -> ((mtime_ns, size), sha1)。外部変更の検出用
+        self._checked_at = {}  # week_key -> 最後に確認した時刻
+        self._unreadable = set()  # 読み込めなかった週（読めるようになるまで上書きしない）
+        self._index_signature = None
+        self._index = None
+        self._scanned_at = float("-inf")  # 最後にシャード一覧とインデックスを突き合わせた時刻
+        self._export = (None, "")  # (version, json)
+        self.version = 0
+        if budget is not None:
+            budget.register(self)
+        if legacy_file is not None:
+            self._migrate_legacy(Path(legacy_file))
+
+    @property
+    def cache_bytes(self):
+        return self._cache_bytes
+
+    def shard_path(self, week_key):
+        return self.data_dir / f"{week_key}.json"
+
+    def _migrate_legacy(self, legacy_file):
+        """旧形式の単一ファイルを週シャードへ分割する。
+
+        全シャード → インデックスの順に書き、最後に旧ファイルを .migrated へ改名して完了の印とする。
+        途中で落ちた場合は _migrating が残るので、次回の起動で最初からやり直す。
+        """
+        if not legacy_file.exists():
+            return
+        marker = self.data_dir / MIGRATING_FILE_NAME
+        migrated_file = legacy_file.with_name(legacy_file.name + ".migrated")
+        with self._write_lock:
+            # 移行の印なしでインデックスがあれば、シャードは移行済み（改名だけ済ませる）
+            if not (self.data_dir / INDEX_FILE_NAME).exists() or marker.exists():
+                try:
+                    task_dicts = json.loads(legacy_file.read_text(encoding="utf-8"))
+                except Exception:
+                    return
+                by_week = {}
+                for d in task_dicts:
+                    by_week.setdefault(week_key_for_date_str(d.get("date", "")), []).append(d)
+                self.data_dir.mkdir(parents=True, exist_ok=True)
+                marker.touch()
+                for week_key, dicts in by_week.items():
+                    self._write_shard_file(week_key, json.dumps(dicts, ensure_ascii=False, indent=2).encode("utf-8"))
+                self._index = {}
+                for week_key, dicts in by_week.items():
+                    self._index_week(week_key, dicts)
+                self._write_index()
+            try:
+                os.replace(legacy_file, migrated_file)
+            except Exception:
+                return
+            if marker.exists():
+                marker.unlink()
+
+    def _write_shard_file(self, week_key, raw):
+        # _write_lock を保持した状態で呼ぶこと。空の週はファイルを消す
+        path = self.shard_path(week_key)
+        if raw is None:
+            if path.exists():
+                path.unlink()
+            return (None, None)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, path)
+        return (self._stat_signature(path), hashlib.sha1(raw).hexdigest())
+
+    @staticmethod
+    def _stat_signature(path):
         try:
-            return json.loads(DATA_FILE.read_text(encoding="utf-8"))
+            stat = path.stat()
         except Exception:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_shard(self, week_key):
+        """シャードを読み、(task_dicts, nbytes, signature) を返す。
+
+        ファイルが無ければ空の週として扱う。書きかけ等で解釈できない、または不正なレコードを含む場合は
+        task_dicts と signature を None にする（空の週と取り違えず、次の確認で読み直す）。
+        署名 ((mtime_ns, size), sha1) の記録は、世代を確かめたうえで呼び出し側が行う。
+        """
+        path = self.shard_path(week_key)
+        stat_signature = self._stat_signature(path)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            with self._cache_lock:
+                self._unreadable.discard(week_key)
+            return [], 0, (None, None)
+        except Exception:
+            raw = None
+        try:
+            task_dicts = json.loads(raw.decode("utf-8"))
+        except Exception:
+            task_dicts = None
+        if isinstance(task_dicts, list):
+            task_dicts = [normalize_task_dict(d) for d in task_dicts]
+            if any(d is None for d in task_dicts):
+                task_dicts = None
+        if task_dicts is None:
+            with self._cache_lock:
+                self._unreadable.add(week_key)
+            return None, 0, None
+        with self._cache_lock:
+            self._unreadable.discard(week_key)
+        return task_dicts, len(raw), (stat_signature, hashlib.sha1(raw).hexdigest())
+
+    def _remember(self, week_key, task_dicts, nbytes):
+        # _cache_lock を保持した状態で呼ぶこと
+        old = self._cache.pop(week_key, None)
+        if old is not None:
+            self._cache_bytes -= old[1]
+        self._cache[week_key] = (task_dicts, nbytes)
+        self._cache_bytes += nbytes
+        # 古い週から追い出す（直近に使った週は必ず残す）
+        cap = self._budget.share(self) if self._budget is not None else self.max_cache_bytes
+        while self._cache_bytes > cap and len(self._cache) > 1:
+            _, (_, evicted_bytes) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted_bytes
+
+    def shrink_to(self, cap):
+        # 他のボードがキャッシュを持ち始めたとき、共有の上限に収まるよう古い週から手放す
+        with self._cache_lock:
+            while self._cache_bytes > cap and self._cache:
+                _, (_, evicted_bytes) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_bytes
+
+    def _rebalance_budget(self):
+        if self._budget is not None:
+            self._budget.rebalance()
+
+    def _ensure_cached(self, week_key):
+        while True:
+            with self._cache_lock:
+                hit = self._cache.get(week_key)
+                if hit is not None:
+                    self._cache.move_to_end(week_key)
+                    return hit[0]
+                event = self._inflight.get(week_key)
+                owner = event is None
+                if owner:
+                    event = self._inflight[week_key] = threading.Event()
+                generation = self._generation.get(week_key, 0)
+            if not owner:
+                # 先読み中なら完了を待って結果を使う
+                event.wait()
+                continue
+            try:
+                task_dicts, nbytes, signature = self._read_shard(week_key)
+                if task_dicts is None:
+                    # 読めない間はキャッシュせず、表示は空にしておく（次回読み直す）
+                    return []
+                with self._cache_lock:
+                    # 読み込み中に書き込まれていたら古い内容はキャッシュしない
+                    if self._generation.get(week_key, 0) == generation:
+                        self._signatures[week_key] = signature
+                        self._remember(week_key, task_dicts, nbytes)
+            finally:
+                with self._cache_lock:
+                    self._inflight.pop(week_key, None)
+                event.set()
+            self._rebalance_budget()
+            return task_dicts
+
+    def load_week(self, week_key):
+        # セッション側で変更されてもキャッシュが汚れないようコピーを返す
+        return copy.deepcopy(self._ensure_cached(week_key))
+
+    def prefetch(self, week_keys):
+        with self._cache_lock:
+            pending = [k for k in week_keys if k not in self._cache and k not in self._inflight]
+        if not pending:
+            return
+
+        def _run():
+            for week_key in pending:
+                self._ensure_cached(week_key)
+
+        threading.Thread(target=_run, name="week-prefetch", daemon=True).start()
+
+    def generation(self, week_key):
+        with self._cache_lock:
+            return self._generation.get(week_key, 0)
+
+    def poll_changes(self, week_keys, interval=WATCH_INTERVAL_SEC):
+        """外部で書き換えられた週を検出してキャッシュを更新し、その week_key を返す。
+
+        mtime/サイズが変わった週だけを読み直し、内容のハッシュが同じなら（touch のみ）無視する。
+        同じ週の確認は interval 秒に一度まで（複数セッションのリランで stat が重ならないように）。
+        """
+        now = time.monotonic()
+        changed = []
+        for week_key in week_keys:
+            with self._cache_lock:
+                if now - self._checked_at.get(week_key, float("-inf")) < interval:
+                    continue
+                self._checked_at[week_key] = now
+                known_stat, known_digest = self._signatures.get(week_key, (None, None))
+                generation = self._generation.get(week_key, 0)
+            if self._stat_signature(self.shard_path(week_key)) == known_stat:
+                continue
+            task_dicts, nbytes, signature = self._read_shard(week_key)
+            # 書きかけ等で読めない場合は前回の内容・世代を保ったまま、次の確認で読み直す
+            if task_dicts is None:
+                continue
+            with self._cache_lock:
+                # 読んでいる間にこのプロセスから書き込まれていたら、読んだ内容は古いので捨てる
+                if self._generation.get(week_key, 0) != generation:
+                    continue
+                self._signatures[week_key] = signature
+                if signature[1] == known_digest:
+                    continue
+                self._generation[week_key] = self._generation.get(week_key, 0) + 1
+                self._remember(week_key, task_dicts, nbytes)
+            changed.append((week_key, task_dicts))
+        if changed:
+            self._rebalance_budget()
+
+        # 統計用インデックスも外部で書き換えられていたら読み直し、変わった週の件数を反映する
+        with self._write_lock:
+            index_changed = self._stat_signature(self.data_dir / INDEX_FILE_NAME) != self._index_signature
+            if index_changed:
+                self._index = None
+            elif self._index is not None and time.monotonic() - self._scanned_at >= interval:
+                # 表示していない週のシャードが追加・削除された場合（バックアップ復元など）も統計に反映する
+                index_changed = self._reconcile_index()
+            if changed:
+                for week_key, task_dicts in changed:
+                    self._index_week(week_key, task_dicts)
+                try:
+                    self._write_index()
+                except Exception:
+                    pass
+            if changed or index_changed:
+                self.version += 1
+        return [week_key for week_key, _ in changed]
+
+    def _shard_week_keys(self):
+        # インデックス等の "_" 始まりのファイルと書き込み途中の .tmp は除く
+        if not self.data_dir.exists():
             return []
-    return []
+        return sorted(p.stem for p in self.data_dir.glob("*.json") if not p.name.startswith("_"))
+
+    def _load_index(self):
+        # _write_lock を保持した状態で呼ぶこと
+        if self._index is None:
+            index_path = self.data_dir / INDEX_FILE_NAME
+            self._index_signature = self._stat_signature(index_path)
+            try:
+                index = json.loads(index_path.read_text(encoding="utf-8"))
+            except Exception:
+                index = None
+            self._index = index if isinstance(index, dict) else {}
+            # 無い・壊れている場合や、バックアップから戻されたシャードがある場合はシャードから組み直す
+            self._reconcile_index(force_write=not isinstance(index, dict))
+        return self._index
+
+    def _reconcile_index(self, force_write=False):
+        """インデックスをディスク上のシャード一覧に合わせる。変わったら True を返す。"""
+        # _write_lock を保持した状態で呼ぶこと
+        index = self._index
+        week_keys = set(self._shard_week_keys())
+        changed = False
+        for week_key in list(index):
+            if week_key not in week_keys:
+                del index[week_key]
+                changed = True
+        for week_key in week_keys:
+            entry = index.get(week_key)
+            if isinstance(entry, dict) and isinstance(entry.get("count"), int):
+                continue
+            task_dicts = self._read_shard(week_key)[0]
+            if task_dicts is None:
+                # 読めないシャードは件数が分からないので、読めるようになるまで数えない
+                index.pop(week_key, None)
+                continue
+            self._index_week(week_key, task_dicts)
+            # 中身が空のシャードも数え終えたことを残す（次の突き合わせで読み直さない）
+            index.setdefault(week_key, {"count": 0, "high": 0})
+            changed = True
+        self._scanned_at = time.monotonic()
+        if (changed or force_write) and week_keys:
+            try:
+                self._write_index()
+            except Exception:
+                pass
+        return changed
+
+    def _index_week(self, week_key, task_dicts):
+        # _write_lock を保持した状態で呼ぶこと
+        index = self._load_index()
+        if task_dicts:
+            index[week_key] = {
+                "count": len(task_dicts),
+                "high": sum(1 for d in task_dicts if d.get("priority") == "high"),
+            }
+        else:
+            index.pop(week_key, None)
+
+    def _write_index(self):
+        # _write_lock を保持した状態で呼ぶこと
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.data_dir / INDEX_FILE_NAME
+        tmp = index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self._load_index()), encoding="utf-8")
+        os.replace(tmp, index_path)
+        self._index_signature = self._stat_signature(index_path)
+
+    def write_week(self, week_key, task_dicts):
+        """週シャードを書き込む。読み込めなかった週は中身を失わないよう書き込まず False を返す。"""
+        with self._cache_lock:
+            if week_key in self._unreadable:
+                return False
+        text = json.dumps(task_dicts, ensure_ascii=False, indent=2)
+        try:
+            with self._write_lock:
+                self.data_dir.mkdir(parents=True, exist_ok=True)
+                signature = self._write_shard_file(week_key, text.encode("utf-8") if task_dicts else None)
+                self._index_week(week_key, task_dicts)
+                self._write_index()
+                self.version += 1
+        except Exception:
+            return False
+        with self._cache_lock:
+            self._signatures[week_key] = signature
+            self._generation[week_key] = self._generation.get(week_key, 0) + 1
+            self._remember(week_key, copy.deepcopy(task_dicts), len(text))
+        self._rebalance_budget()
+        return True
+
+    def stats(self):
+        with self._write_lock:
+            index = self._load_index()
+            total = sum(v.get("count", 0) for v in index.values())
+            high = sum(v.get("high", 0) for v in index.values())
+        return total, high
+
+    def export_json(self):
+        # 全シャードの結合はダウンロード用。書き込みがあるまで結果を使い回す
+        version, data = self._export
+        if version != self.version:
+            # インデックスではなくディスク上のシャードから集める（インデックスに漏れがあっても欠けない）
+            with self._write_lock:
+                week_keys = self._shard_week_keys()
+            all_dicts = []
+            for week_key in week_keys:
+                all_dicts.extend(self._read_shard(week_key)[0] or [])
+            data = json.dumps(all_dicts, ensure_ascii=False, indent=2) if all_dicts else ""
+            self._export = (self.version, data)
+        return data
+
+    def clear(self):
+        with self._write_lock:
+            if self.data_dir.exists():
+                for path in self.data_dir.glob("*.json"):
+                    try:
+                        path.unlink()
+                    except Exception:
+                        pass
+            self._index = {}
+            try:
+                self._write_index()
+            except Exception:
+                pass
+            self.version += 1
+        with self._cache_lock:
+            for week_key in set(self._cache) | set(self._inflight):
+                self._generation[week_key] = self._generation.get(week_key, 0) + 1
+            self._cache.clear()
+            self._cache_bytes = 0
+
+
+def normalize_board_name(name):
+    name = (name or "").strip()
+    return name if BOARD_NAME_PATTERN.match(name) else None
+
+
+def board_data_dir(board):
+    return DATA_DIR if board == DEFAULT_BOARD else BOARDS_DIR / board
+
+
+def list_boards():
+    names = []
+    if BOARDS_DIR.exists():
+        names = sorted(p.name for p in BOARDS_DIR.iterdir() if p.is_dir() and normalize_board_name(p.name))
+    return [DEFAULT_BOARD] + [n for n in names if n != DEFAULT_BOARD]
+
+
+# 週キャッシュの上限はプロセス全体で1つ（キャッシュを持っているボードで等分）
+@st.cache_resource(show_spinner=False)
+def get_cache_budget():
+    return CacheBudget(WEEK_CACHE_MAX_BYTES)
+
+
+# ボードごとに独立したストア（ロック・世代・統計は共有しない）
+# ストアは追い出さない（同じボードにロックの違うストアが2つできないように）。手放すのは週キャッシュだけ
+@st.cache_resource(show_spinner=False)
+def get_store(board=DEFAULT_BOARD):
+    legacy_file = DATA_FILE if board == DEFAULT_BOARD else None
+    return WeekShardStore(board_data_dir(board), legacy_file=legacy_file, budget=get_cache_budget())
+
+
+# URLクエリパラメータ（?board=name）。st.query_params が無い版は experimental API にフォールバック
+def get_query_board():
+    try:
+        if hasattr(st, "query_params"):
+            return st.query_params.get("board")
+        return (st.experimental_get_query_params().get("board") or [None])[0]
+    except Exception:
+        return None
 
 
-def persist_tasks_to_disk(task_dicts):
+def set_query_board(board):
     try:
-        with _PERSIST_LOCK:
-            DATA_FILE.write_text(
-                json.dumps(task_dicts, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+        if hasattr(st, "query_params"):
+            st.query_params["board"] = board
+        else:
+            st.experimental_set_query_params(board=board)
     except Exception:
         pass
 
 
+def parse_estimate(value):
+    # 外部で編集されたシャードも読むので、数値（0以上）として解釈できないものは未見積もり扱い
+    if isinstance(value, bool):
+        return None
+    try:
+        hours = float(value)
+    except (TypeError, ValueError):
+        return None
+    return hours if math.isfinite(hours) and hours >= 0 else None
+
+
 class Task:
     def __init__(
         self,
@@ -127,6 +719,8 @@ class Task:
         priority="medium",
         labels=None,
         attachments=None,
+        estimate=None,
+        pinned=False,
     ):
         self.id = id or str(uuid.uuid4())
         self.title = title
@@ -135,6 +729,8 @@ class Task:
         self.priority = priority  # low/medium/high
         self.labels = labels or []
         self.attachments = attachments or []  # base64データURI
+        self.estimate = estimate  # 見積もり（時間）。None は未見積もり
+        self.pinned = pinned  # True なら負荷調整で日付を動かさない
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
 
@@ -147,6 +743,8 @@ class Task:
             "priority": self.priority,
             "labels": self.labels,
             "attachments": self.attachments,
+            "estimate": self.estimate,
+            "pinned": self.pinned,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
@@ -155,12 +753,14 @@ class Task:
     def from_dict(cls, data):
         task = cls(
             id=data["id"],
-            title=data["title"],
-            description=data["description"],
-            date=data["date"],
-            priority=data["priority"],
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            date=data.get("date", ""),
+            priority=data.get("priority", "medium"),
             labels=data.get("labels", []),
             attachments=data.get("attachments", []),
+            estimate=parse_estimate(data.get("estimate")),
+            pinned=data.get("pinned") is True,
         )
         try:
             if data.get("created_at"):
@@ -175,17 +775,173 @@ class Task:
         return task
 
 
-# セッション初期化（起動時は常に現在週を表示）
+# セッション初期化（起動時は常に現在週を表示。タスクは週単位で読み込む）
 if "initialized" not in st.session_state:
-    st.session_state.tasks = [Task.from_dict(d) for d in load_tasks_from_disk()]
+    # URL で指定できるのは作成済みのボードだけ（URL の書き換えでストアを増やせないように）
+    query_board = normalize_board_name(get_query_board())
+    st.session_state.board = query_board if query_board in list_boards() else DEFAULT_BOARD
+    st.session_state.tasks = []
+    st.session_state.loaded_weeks = OrderedDict()  # week_key -> 読み込んだ時点の世代（LRU順）
+    st.session_state.task_weeks = {}  # task_id -> 保存先の week_key
+    st.session_state.refreshed_dates = set()  # 外部変更を反映した日付（曜日ヘッダに表示）
     st.session_state.current_week = datetime.now().date()
     st.session_state.image_modal_open = False
     st.session_state.image_modal = None
     st.session_state.edit_task_id = None
     st.session_state.new_task_date = None
+    st.session_state.first_paint_ms = None
+    st.session_state.rebalance_plan = None  # {"week": week_key, "moves": {task_id: 日付}}
+    st.session_state.export_json = None  # 「エクスポートを準備」で作った全週の JSON
     st.session_state.initialized = True
 
 
+# 週単位の読み込み（選択中のボードのみ）
+def current_store():
+    return get_store(st.session_state.board)
+
+
+def reset_loaded_tasks():
+    st.session_state.tasks = []
+    st.session_state.loaded_weeks = OrderedDict()
+    st.session_state.task_weeks = {}
+    st.session_state.export_json = None
+
+
+def ensure_week_loaded(week_key):
+    loaded = st.session_state.loaded_weeks
+    if week_key in loaded:
+        loaded.move_to_end(week_key)
+        return
+    store = current_store()
+    # 読み込み中に変更されても次の同期で拾えるよう、世代は読み込み前に控える
+    generation = store.generation(week_key)
+    incoming = [Task.from_dict(d) for d in store.load_week(week_key)]
+    incoming_ids = {t.id for t in incoming}
+    # 他セッションで週をまたいで移されたタスクは、別の週の古い写しをこの週の内容で置き換える
+    st.session_state.tasks = [t for t in st.session_state.tasks if t.id not in incoming_ids] + incoming
+    for task in incoming:
+        st.session_state.task_weeks[task.id] = week_key
+    loaded[week_key] = generation
+
+
+def evict_far_weeks(protect):
+    loaded = st.session_state.loaded_weeks
+    while len(loaded) > SESSION_MAX_WEEKS:
+        victim = next((k for k in loaded if k not in protect), None)
+        if victim is None:
+            break
+        del loaded[victim]
+        dropped = {tid for tid, k in st.session_state.task_weeks.items() if k == victim}
+        st.session_state.tasks = [t for t in st.session_state.tasks if t.id not in dropped]
+        for tid in dropped:
+            del st.session_state.task_weeks[tid]
+
+
+def ensure_window_loaded(center_date):
+    current = week_key_for_date(center_date)
+    neighbors = [
+        week_key_for_date(center_date - timedelta(days=7)),
+        week_key_for_date(center_date + timedelta(days=7)),
+    ]
+    ensure_week_loaded(current)
+    # 前後の週は別スレッドで先読み（週移動時はキャッシュから即座に読み込める）
+    current_store().prefetch(neighbors)
+    evict_far_weeks(protect={current, *neighbors})
+
+
+def persist_week(week_key):
+    store = current_store()
+    week_tasks = [t for t in st.session_state.tasks if week_key_for_date_str(t.date) == week_key]
+    if not store.write_week(week_key, [t.to_dict() for t in week_tasks]):
+        st.error(f"{week_key} の保存ファイルを読み込めないため、保存を見送りました。")
+        return
+    for t in week_tasks:
+        st.session_state.task_weeks[t.id] = week_key
+    # 自分の書き込みは外部変更として扱わない
+    if week_key in st.session_state.loaded_weeks:
+        st.session_state.loaded_weeks[week_key] = store.generation(week_key)
+
+
+# 外部変更の取り込み（他セッション・スクリプト・バックアップ復元）
+def task_differs(task, updated, d):
+    # Task を通した形で比べ、旧形式や手編集で欠けた項目は差分と見なさない。
+    # 日時が無い・読めないレコードは読み込むたびに現在時刻になるので比較から外す
+    before, after = task.to_dict(), updated.to_dict()
+    for key in ("created_at", "updated_at"):
+        try:
+            datetime.fromisoformat(d[key])
+        except Exception:
+            before.pop(key)
+            after.pop(key)
+    return before != after
+
+
+def apply_week_snapshot(week_key, task_dicts):
+    """週シャードの最新内容と差分のあるタスクだけを差し替え、影響した日付を返す。"""
+    incoming = {d["id"]: d for d in task_dicts}
+    task_weeks = st.session_state.task_weeks
+    affected = set()
+    kept = []
+    seen = set()
+    for task in st.session_state.tasks:
+        if task.id in seen:
+            # 同じ id の写しが残っていたら1つにまとめる
+            continue
+        d = incoming.pop(task.id, None)
+        if d is not None:
+            # この週にあるタスク。別の週のものとして持っていた古い写しもここで置き換わる
+            updated = Task.from_dict(d)
+            if task_weeks.get(task.id) != week_key or task_differs(task, updated, d):
+                kept.append(updated)
+                affected.update({task.date, updated.date})
+            else:
+                kept.append(task)
+            task_weeks[task.id] = week_key
+        elif task_weeks.get(task.id) == week_key:
+            # 削除された（または別の週へ移された）
+            del task_weeks[task.id]
+            affected.add(task.date)
+            continue
+        else:
+            kept.append(task)
+        seen.add(task.id)
+    for d in incoming.values():
+        added = Task.from_dict(d)
+        kept.append(added)
+        task_weeks[added.id] = week_key
+        affected.add(added.date)
+    st.session_state.tasks = kept
+    return affected
+
+
+def sync_external_changes():
+    store = current_store()
+    loaded = st.session_state.loaded_weeks
+    store.poll_changes(list(loaded))
+    affected = set()
+    for week_key, seen in list(loaded.items()):
+        generation = store.generation(week_key)
+        if generation == seen:
+            continue
+        affected |= apply_week_snapshot(week_key, store.load_week(week_key))
+        loaded[week_key] = generation
+    if affected:
+        st.session_state.refreshed_dates |= affected
+    return affected
+
+
+def _watch_store_changes():
+    if sync_external_changes():
+        st.rerun()
+
+
+# st.fragment(run_every) がある版では、操作がなくても定期的に変更を確認する
+if hasattr(st, "fragment"):
+    watch_store_changes = st.fragment(run_every=WATCH_INTERVAL_SEC)(_watch_store_changes)
+else:
+    watch_store_changes = _watch_store_changes
+
+
 # ユーティリティ
 def get_week_dates(start_date):
     monday = start_date - timedelta(days=start_date.weekday())
@@ -202,18 +958,26 @@ def get_tasks_for_date(date_str):
 
 
 def save_task(task):
+    old_week = st.session_state.task_weeks.get(task.id)
+    new_week = week_key_for_date_str(task.date)
+    # 別の週へ移した場合は移動先の週も読み込んでから書き込む
+    ensure_week_loaded(new_week)
     idx = next((i for i, t in enumerate(st.session_state.tasks) if t.id == task.id), None)
     task.updated_at = datetime.now()
     if idx is not None:
         st.session_state.tasks[idx] = task
     else:
         st.session_state.tasks.append(task)
-    persist_tasks_to_disk([t.to_dict() for t in st.session_state.tasks])
+    persist_week(new_week)
+    if old_week and old_week != new_week:
+        persist_week(old_week)
 
 
 def delete_task(task_id):
+    week_key = st.session_state.task_weeks.pop(task_id, None)
     st.session_state.tasks = [t for t in st.session_state.tasks if t.id != task_id]
-    persist_tasks_to_disk([t.to_dict() for t in st.session_state.tasks])
+    if week_key:
+        persist_week(week_key)
 
 
 def process_uploaded_image(uploaded_file):
@@ -231,33 +995,35 @@ def process_uploaded_image(uploaded_file):
 
 
 # HTMLダッシュボード
+DASHBOARD_CSS = """
+<style>
+  body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Noto Sans JP", "Yu Gothic", Arial, sans-serif; background:#f3f4f6; margin:0; padding:1rem;}
+  .container{max-width:1200px;margin:0 auto;}
+  .week-header{background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);color:#fff;padding:1rem;border-radius:10px;text-align:center;margin-bottom:1rem;}
+  .grid{display:grid;grid-template-columns:repeat(7,1fr);gap:10px;}
+  .day{background:#f8fafc;border-radius:8px;padding:10px;border:2px solid #e2e8f0;min-height:200px;}
+  .title{font-size:14px;font-weight:700;margin-bottom:6px;}
+  .date{font-size:12px;color:#6b7280;margin-bottom:8px;}
+  .task-card{background:#fff;border-radius:8px;padding:8px;margin:6px 0;border-left:4px solid #3b82f6;box-shadow:0 2px 4px rgba(0,0,0,0.06);}
+  .task-card.high{border-left-color:#ef4444;}
+  .task-card.medium{border-left-color:#f59e0b;}
+  .task-card.low{border-left-color:#10b981;}
+  .priority-badge{display:inline-block;padding:2px 6px;border-radius:9999px;font-size:10px;font-weight:700;margin-right:6px;}
+  .priority-high{background:#fecaca;color:#dc2626;}
+  .priority-medium{background:#fed7aa;color:#ea580c;}
+  .priority-low{background:#bbf7d0;color:#059669;}
+  .label{display:inline-block;background:#e0e7ff;color:#3730a3;padding:2px 6px;border-radius:12px;font-size:10px;margin:2px;}
+  img.thumb{max-width:100%;border-radius:6px;border:1px solid #e5e7eb;margin-top:6px;}
+  .desc{font-size:12px;color:#374151;margin-top:4px;white-space:pre-wrap;}
+</style>
+"""
+
+
 def generate_week_html(week_dates):
     weekdays_jp = ["月曜日", "火曜日", "水曜日", "木曜日", "金曜日", "土曜日", "日曜日"]
-    css = """
-    <style>
-      body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Noto Sans JP", "Yu Gothic", Arial, sans-serif; background:#f3f4f6; margin:0; padding:1rem;}
-      .container{max-width:1200px;margin:0 auto;}
-      .week-header{background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);color:#fff;padding:1rem;border-radius:10px;text-align:center;margin-bottom:1rem;}
-      .grid{display:grid;grid-template-columns:repeat(7,1fr);gap:10px;}
-      .day{background:#f8fafc;border-radius:8px;padding:10px;border:2px solid #e2e8f0;min-height:200px;}
-      .title{font-size:14px;font-weight:700;margin-bottom:6px;}
-      .date{font-size:12px;color:#6b7280;margin-bottom:8px;}
-      .task-card{background:#fff;border-radius:8px;padding:8px;margin:6px 0;border-left:4px solid #3b82f6;box-shadow:0 2px 4px rgba(0,0,0,0.06);}
-      .task-card.high{border-left-color:#ef4444;}
-      .task-card.medium{border-left-color:#f59e0b;}
-      .task-card.low{border-left-color:#10b981;}
-      .priority-badge{display:inline-block;padding:2px 6px;border-radius:9999px;font-size:10px;font-weight:700;margin-right:6px;}
-      .priority-high{background:#fecaca;color:#dc2626;}
-      .priority-medium{background:#fed7aa;color:#ea580c;}
-      .priority-low{background:#bbf7d0;color:#059669;}
-      .label{display:inline-block;background:#e0e7ff;color:#3730a3;padding:2px 6px;border-radius:12px;font-size:10px;margin:2px;}
-      img.thumb{max-width:100%;border-radius:6px;border:1px solid #e5e7eb;margin-top:6px;}
-      .desc{font-size:12px;color:#374151;margin-top:4px;white-space:pre-wrap;}
-    </style>
-    """
     ws, we = week_dates[0].strftime("%Y/%m/%d"), week_dates[6].strftime("%Y/%m/%d")
     html = [
-        css,
+        DASHBOARD_CSS,
         '<div class="container">',
         f'<div class="week-header"><h2>📅 {ws} - {we}</h2></div>',
         '<div class="grid">',
@@ -291,6 +1057,139 @@ def generate_week_html(week_dates):
     return "".join(html)
 
 
+# 負荷計画（見積もり時間と作業可能時間から曜日ごとの負荷を出し、超過分を他の曜日へ移す）
+DEFAULT_ESTIMATE_HOURS = 1.0  # 未見積もりのタスクはこの時間として扱う
+DEFAULT_WEEKDAY_CAPACITY = 8.0  # 平日の作業可能時間
+DEFAULT_WEEKEND_CAPACITY = 4.0  # 土日の作業可能時間
+PLANNER_MAX_ITERATIONS = 200  # 局所探索の上限
+PLANNER_MIN_GAIN_HOURS = 0.25  # 1回の移動・入れ替えで減らす超過時間の最小値（これ未満の改善は提案しない）
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+def task_hours(task):
+    return task.estimate if task.estimate is not None else DEFAULT_ESTIMATE_HOURS
+
+
+def get_day_capacities(week_dates):
+    weekday = st.session_state.get("capacity_weekday", DEFAULT_WEEKDAY_CAPACITY)
+    weekend = st.session_state.get("capacity_weekend", DEFAULT_WEEKEND_CAPACITY)
+    return [weekend if d.weekday() >= 5 else weekday for d in week_dates]
+
+
+def compute_day_loads(tasks, date_keys):
+    loads = {ds: 0.0 for ds in date_keys}
+    for task in tasks:
+        if task.date in loads:
+            loads[task.date] += task_hours(task)
+    return loads
+
+
+def plan_week_rebalance(tasks, date_keys, capacities):
+    """作業可能時間の超過が小さくなるよう、週内のタスクの割り当てを組み直す。
+
+    戻り値は動かすタスクだけの {task_id: 新しい日付}。固定（pinned）のタスクは動かさず、
+    高優先度のタスクは元の日付より後ろへは動かさない。まず超過日から低優先度・大きいタスクの順に
+    空きのある日へ移し（貪欲法）、残った超過は移動と入れ替えの局所探索で減らす。
+    どちらも超過時間の合計が PLANNER_MIN_GAIN_HOURS 以上減る手だけを採用するので、
+    全曜日が超過していて合計を減らせない週では何も動かさない。
+    """
+    n = len(date_keys)
+    day_index = {ds: i for i, ds in enumerate(date_keys)}
+    caps = list(capacities)
+    week_tasks = [t for t in tasks if t.date in day_index]
+    hours = {t.id: task_hours(t) for t in week_tasks}
+    rank = {t.id: PRIORITY_RANK.get(t.priority, 1) for t in week_tasks}
+    original = {t.id: day_index[t.date] for t in week_tasks}
+    assign = dict(original)
+    loads = [0.0] * n
+    for tid, i in assign.items():
+        loads[i] += hours[tid]
+
+    # 動かせるタスクと移動先の候補
+    allowed = {}
+    for t in week_tasks:
+        if not t.pinned:
+            allowed[t.id] = range(original[t.id] + 1) if t.priority == "high" else range(n)
+    movable = [set() for _ in range(n)]
+    for tid in allowed:
+        movable[assign[tid]].add(tid)
+
+    def over(i, load):
+        return load - caps[i] if load > caps[i] else 0.0
+
+    def gain(i, j, diff):
+        # i から j へ diff 時間ぶん移したときに減る、超過時間の合計
+        return over(i, loads[i]) + over(j, loads[j]) - over(i, loads[i] - diff) - over(j, loads[j] + diff)
+
+    def move(tid, j):
+        i = assign[tid]
+        loads[i] -= hours[tid]
+        loads[j] += hours[tid]
+        movable[i].discard(tid)
+        movable[j].add(tid)
+        assign[tid] = j
+
+    # 1) 貪欲法：超過の大きい日から、低優先度・大きいタスクを超過が最も減る日へ移す（同じなら空きの多い日）
+    for i in sorted(range(n), key=lambda d: loads[d] - caps[d], reverse=True):
+        for tid in sorted(movable[i], key=lambda x: (-rank[x], -hours[x])):
+            if loads[i] <= caps[i]:
+                break
+            best = None  # (gain, slack, day)
+            for j in allowed[tid]:
+                # 超過している日へ移しても合計は減らない
+                if j == i or loads[j] >= caps[j]:
+                    continue
+                g = gain(i, j, hours[tid])
+                if g >= PLANNER_MIN_GAIN_HOURS and (best is None or (g, caps[j] - loads[j]) > best[:2]):
+                    best = (g, caps[j] - loads[j], j)
+            if best is not None:
+                move(tid, best[2])
+
+    # 2) 局所探索：超過を最も減らす移動、なければ入れ替えを、改善がなくなるまで繰り返す
+    for _ in range(PLANNER_MAX_ITERATIONS):
+        overloaded = [i for i in range(n) if loads[i] > caps[i]]
+        if not overloaded:
+            break
+        best_gain, best_action = PLANNER_MIN_GAIN_HOURS, None
+        for i in overloaded:
+            for tid in movable[i]:
+                for j in allowed[tid]:
+                    if j == i or loads[j] >= caps[j]:
+                        continue
+                    g = gain(i, j, hours[tid])
+                    if g >= best_gain:
+                        best_gain, best_action = g, (tid, j, None)
+        if best_action is None:
+            # 大きいタスクを空きのある日の小さいタスクと入れ替える（最初に見つかった改善を採用）
+            for i in overloaded:
+                for tid in movable[i]:
+                    for j in allowed[tid]:
+                        if j == i or loads[j] >= caps[j]:
+                            continue
+                        for uid in movable[j]:
+                            diff = hours[tid] - hours[uid]
+                            if diff < PLANNER_MIN_GAIN_HOURS or i not in allowed[uid]:
+                                continue
+                            if gain(i, j, diff) >= PLANNER_MIN_GAIN_HOURS:
+                                best_action = (tid, j, uid)
+                                break
+                        if best_action:
+                            break
+                    if best_action:
+                        break
+                if best_action:
+                    break
+        if best_action is None:
+            break
+        tid, j, uid = best_action
+        i = assign[tid]
+        move(tid, j)
+        if uid is not None:
+            move(uid, i)
+
+    return {tid: date_keys[i] for tid, i in assign.items() if i != original[tid]}
+
+
 # st.modal のフォールバック
 @contextmanager
 def modal_or_expander(title: str, key: str):
@@ -321,66 +1220,15 @@ def render_dnd_board(week_dates):
         # ヘッダにタスク数を表示
         containers_payload.append({"header": f"{format_date_jp(d)}（{len(items)}）", "items": items})
 
-    # スタイル設定：各コンテナを「inline-block + 固定幅」にして横並び、横スクロール可能に
-    CONTAINER_WIDTH = 220  # px
     kwargs = {
         "multi_containers": True,
         "direction": "horizontal",
         "key": f"dnd_{week_key}",  # 安定キー
+        **_COMPONENTS["sortable_style_kwargs"],
     }
-    try:
-        params = inspect.signature(sort_items).parameters
-        if "styles" in params:
-            kwargs["styles"] = {
-                "container": {
-                    "display": "inline-block",
-                    "verticalAlign": "top",
-                    "width": f"{CONTAINER_WIDTH}px",
-                    "minWidth": f"{CONTAINER_WIDTH}px",
-                    "minHeight": "160px",
-                    "backgroundColor": "#f8fafc",
-                    "border": "2px dashed #e2e8f0",
-                    "borderRadius": "10px",
-                    "padding": "8px",
-                    "margin": "6px",
-                },
-                "item": {
-                    "padding": "6px 10px",
-                    "margin": "4px 0",
-                    "backgroundColor": "#fff",
-                    "border": "1px solid #e5e7eb",
-                    "borderRadius": "8px",
-                    "cursor": "grab",
-                    "whiteSpace": "normal",
-                },
-            }
-        elif "container_style" in params and "item_style" in params:
-            kwargs["container_style"] = {
-                "display": "inline-block",
-                "verticalAlign": "top",
-                "width": f"{CONTAINER_WIDTH}px",
-                "minWidth": f"{CONTAINER_WIDTH}px",
-                "minHeight": "160px",
-                "backgroundColor": "#f8fafc",
-                "border": "2px dashed #e2e8f0",
-                "borderRadius": "10px",
-                "padding": "8px",
-                "margin": "6px",
-            }
-            kwargs["item_style"] = {
-                "padding": "6px 10px",
-                "margin": "4px 0",
-                "backgroundColor": "#fff",
-                "border": "1px solid #e5e7eb",
-                "borderRadius": "8px",
-                "cursor": "grab",
-                "whiteSpace": "normal",
-            }
-    except Exception:
-        pass
 
     # 実行
-    new_containers = sort_items(containers_payload, **kwargs)
+    new_containers = _COMPONENTS["sort_items"](containers_payload, **kwargs)
 
     # 並び替え結果を反映（末尾の [id:xxxxxxxx] を抜き出し）
     id_to_new_date = {}
@@ -402,16 +1250,18 @@ def render_dnd_board(week_dates):
                     id_to_new_date[t.id] = ds
                     break
 
-    changed = False
+    changed_weeks = set()
     for task in st.session_state.tasks:
         new_date = id_to_new_date.get(task.id)
         if new_date and new_date != task.date:
+            changed_weeks.add(st.session_state.task_weeks.get(task.id))
             task.date = new_date
             task.updated_at = datetime.now()
-            changed = True
+            changed_weeks.add(week_key_for_date_str(new_date))
 
-    if changed:
-        persist_tasks_to_disk([t.to_dict() for t in st.session_state.tasks])
+    if changed_weeks:
+        for week_key in changed_weeks - {None}:
+            persist_week(week_key)
         st.success("タスクの日付を更新しました。")
         st.rerun()
 
@@ -470,6 +1320,10 @@ def render_edit_modal():
                     key=f"edit_pri_{tid}",
                 )
                 new_labels_str = st.text_input("ラベル (カンマ区切り)", value=",".join(task.labels), key=f"edit_labels_{tid}")
+                new_estimate = st.number_input(
+                    "見積もり（時間）", min_value=0.0, step=0.5, value=task.estimate, key=f"edit_estimate_{tid}"
+                )
+                new_pinned = st.checkbox("日付を固定（自動調整で動かさない）", value=task.pinned, key=f"edit_pinned_{tid}")
                 clear_attachments = st.checkbox("既存の添付を全削除", value=False, key=f"edit_clear_{tid}")
             st.markdown("新しい画像を追加（任意）")
             new_upload = st.file_uploader(
@@ -489,6 +1343,8 @@ def render_edit_modal():
             task.date = new_date.strftime("%Y-%m-%d")
             task.priority = new_pri
             task.labels = [s.strip() for s in new_labels_str.split(",") if s.strip()]
+            task.estimate = new_estimate
+            task.pinned = new_pinned
             if clear_attachments:
                 task.attachments = []
             if new_upload:
@@ -541,6 +1397,8 @@ def render_new_task_modal():
                 st.text_input("日付（固定）", value=ds, disabled=True, key=f"date_{ds}")
                 priority = st.selectbox("優先度", ["low", "medium", "high"], index=1, key=f"pri_{ds}")
                 labels_input = st.text_input("ラベル (カンマ区切り)", key=f"labels_{ds}")
+                estimate = st.number_input("見積もり（時間）", min_value=0.0, step=0.5, value=None, key=f"estimate_{ds}")
+                pinned = st.checkbox("日付を固定（自動調整で動かさない）", key=f"pinned_{ds}")
             uploaded_file = st.file_uploader(
                 "画像を添付", type=["png", "jpg", "jpeg", "gif"], key=f"upload_{ds}"
             )
@@ -566,6 +1424,8 @@ def render_new_task_modal():
                 priority=priority,
                 labels=labels,
                 attachments=attachments,
+                estimate=estimate,
+                pinned=pinned,
             )
             save_task(new_task)
             close_new_task_modal()
@@ -573,6 +1433,105 @@ def render_new_task_modal():
             st.rerun()
 
 
+# 起動計測（import 時間と初回描画までの時間）
+def render_perf_report(slot):
+    elapsed_ms = (time.perf_counter() - _SCRIPT_T0) * 1000
+    if st.session_state.first_paint_ms is None:
+        st.session_state.first_paint_ms = elapsed_ms
+    with slot.container():
+        with st.expander("⏱️ 起動計測", expanded=False):
+            st.caption(f"スクリプト import: {(_IMPORT_DONE - _SCRIPT_T0) * 1000:.1f} ms")
+            for name, ms in _COMPONENTS["import_ms"].items():
+                st.caption(f"{name} import（プロセス初回のみ）: {ms:.1f} ms")
+            st.caption(f"初回描画: {st.session_state.first_paint_ms:.1f} ms")
+            st.caption(f"今回のリラン: {elapsed_ms:.1f} ms")
+
+
+# 負荷の自動調整（提案 → 適用）
+def render_rebalance_panel(week_dates):
+    date_keys = [d.strftime("%Y-%m-%d") for d in week_dates]
+    week_key = week_key_for_date(week_dates[0])
+    if st.button("⚖️ 調整案を作成", key=f"plan_{week_key}"):
+        week_tasks = [t for t in st.session_state.tasks if t.date in date_keys]
+        st.session_state.rebalance_plan = {
+            "board": st.session_state.board,
+            "week": week_key,
+            "generation": current_store().generation(week_key),
+            "moves": plan_week_rebalance(week_tasks, date_keys, get_day_capacities(week_dates)),
+        }
+
+    plan = st.session_state.get("rebalance_plan")
+    if not plan or plan["board"] != st.session_state.board or plan["week"] != week_key:
+        st.caption("見積もり時間と作業可能時間から、超過している曜日のタスクを他の曜日へ移す案を作ります（📌固定のタスクは動かしません）。")
+        return
+    # 案を作った後にこの週が書き換えられていたら（編集・他セッション・外部変更）作り直してもらう
+    if current_store().generation(week_key) != plan["generation"]:
+        st.session_state.rebalance_plan = None
+        st.warning("調整案の作成後にこの週のタスクが変更されました。もう一度作成してください。")
+        return
+    tasks_by_id = {t.id: t for t in st.session_state.tasks}
+    # 念のため、今も週内にあり固定されていないタスクの移動だけを残す
+    moves = {
+        tid: ds
+        for tid, ds in plan["moves"].items()
+        if tid in tasks_by_id
+        and tasks_by_id[tid].date in date_keys
+        and not tasks_by_id[tid].pinned
+        and ds in date_keys
+    }
+    if not moves:
+        st.success("超過を減らせる移動はありません。")
+        return
+    for tid, ds in moves.items():
+        task = tasks_by_id[tid]
+        src = datetime.strptime(task.date, "%Y-%m-%d").date()
+        dst = datetime.strptime(ds, "%Y-%m-%d").date()
+        st.markdown(f"- {task.title}（{task_hours(task):g}h）: {format_date_jp(src)} → {format_date_jp(dst)}")
+    apply_col, discard_col = st.columns(2)
+    with apply_col:
+        if st.button("✅ 調整案を適用", key=f"apply_plan_{week_key}"):
+            for tid, ds in moves.items():
+                tasks_by_id[tid].date = ds
+                tasks_by_id[tid].updated_at = datetime.now()
+            persist_week(week_key)
+            st.session_state.rebalance_plan = None
+            st.success("タスクの日付を調整しました。")
+            st.rerun()
+    with discard_col:
+        if st.button("破棄", key=f"discard_plan_{week_key}"):
+            st.session_state.rebalance_plan = None
+            st.rerun()
+
+
+# ボード切り替え
+def switch_board(board):
+    st.session_state.board = board
+    reset_loaded_tasks()
+    close_edit_modal()
+    close_new_task_modal()
+    close_image_modal()
+    set_query_board(board)
+    st.rerun()
+
+
+def render_board_selector():
+    st.subheader("🗂️ ボード")
+    boards = list_boards()
+    if st.session_state.board not in boards:
+        boards.append(st.session_state.board)
+    selected = st.selectbox("ボードを選択", boards, index=boards.index(st.session_state.board))
+    if selected != st.session_state.board:
+        switch_board(selected)
+    new_board = st.text_input("新しいボード名（英数字・-・_）", key="new_board_name")
+    if st.button("＋ ボードを作成"):
+        name = normalize_board_name(new_board)
+        if name:
+            board_data_dir(name).mkdir(parents=True, exist_ok=True)
+            switch_board(name)
+        else:
+            st.error("ボード名は英数字・-・_ の40文字以内で入力してください。")
+
+
 # メイン
 def main():
     st.markdown('<h1 class="main-header">📅 週間タスクスケジューラー</h1>', unsafe_allow_html=True)
@@ -580,22 +1539,33 @@ def main():
     # サイドバー
     with st.sidebar:
         st.header("⚙️ 設定")
+        render_board_selector()
         week_start = st.date_input("週を選択", value=st.session_state.current_week, key="week_selector")
         st.session_state.current_week = week_start
+        # 先に外部変更を取り込んでから表示週を読み込む（移動済みタスクの古い写しを残さない）
+        sync_external_changes()
+        ensure_window_loaded(st.session_state.current_week)
 
         st.subheader("📊 タスク統計（全体）")
-        total_tasks = len(st.session_state.tasks)
-        high_priority = len([t for t in st.session_state.tasks if t.priority == "high"])
+        total_tasks, high_priority = current_store().stats()
         st.metric("総タスク数", total_tasks)
         st.metric("高優先度", high_priority)
 
+        st.subheader("⚖️ 作業可能時間（1日あたり）")
+        st.number_input("平日（時間）", min_value=0.0, step=0.5, value=DEFAULT_WEEKDAY_CAPACITY, key="capacity_weekday")
+        st.number_input("土日（時間）", min_value=0.0, step=0.5, value=DEFAULT_WEEKEND_CAPACITY, key="capacity_weekend")
+
         st.subheader("💾 データ管理")
-        if st.session_state.tasks:
-            data = json.dumps([t.to_dict() for t in st.session_state.tasks], ensure_ascii=False, indent=2)
+        # 全週の結合は重いので、ボタンを押したときだけ作る
+        if st.button("📦 JSONエクスポートを準備"):
+            st.session_state.export_json = current_store().export_json()
+            if not st.session_state.export_json:
+                st.caption("エクスポートするタスクがありません。")
+        if st.session_state.get("export_json"):
             st.download_button(
                 "📥 JSONダウンロード",
-                data=data,
-                file_name=f"tasks_{datetime.now().strftime('%Y%m%d')}.json",
+                data=st.session_state.export_json,
+                file_name=f"tasks_{st.session_state.board}_{datetime.now().strftime('%Y%m%d')}.json",
                 mime="application/json",
             )
 
@@ -605,17 +1575,19 @@ def main():
         st.download_button(
             "📤 HTMLダウンロード",
             data=html_data,
-            file_name=f"tasks_dashboard_{week_dates_sb[0].strftime('%Y%m%d')}_{week_dates_sb[6].strftime('%Y%m%d')}.html",
+            file_name=f"tasks_dashboard_{st.session_state.board}_{week_dates_sb[0].strftime('%Y%m%d')}_{week_dates_sb[6].strftime('%Y%m%d')}.html",
             mime="text/html",
         )
 
         st.subheader("危険な操作")
         if st.button("🗑️ 全データクリア", type="secondary"):
             if st.checkbox("本当に削除しますか？"):
-                st.session_state.tasks = []
-                persist_tasks_to_disk([])
+                current_store().clear()
+                reset_loaded_tasks()
                 st.rerun()
 
+        perf_slot = st.empty()
+
     # 週表示
     week_dates = get_week_dates(st.session_state.current_week)
     ws, we = week_dates[0].strftime("%Y/%m/%d"), week_dates[6].strftime("%Y/%m/%d")
@@ -640,17 +1612,35 @@ def main():
         else:
             st.info("この機能を使うには requirements.txt に 'streamlit-sortables' を追加してください。")
 
+    with st.expander("⚖️ 負荷の自動調整（週内）", expanded=False):
+        render_rebalance_panel(week_dates)
+
     # 週間ビュー（各カラム：曜日ヘッダ → 追加ボタン → タスクリスト）
     cols = st.columns(7)
     weekdays = ["月曜日", "火曜日", "水曜日", "木曜日", "金曜日", "土曜日", "日曜日"]
 
+    # 曜日ごとの負荷（見積もり時間の合計 / 作業可能時間）
+    date_keys = [d.strftime("%Y-%m-%d") for d in week_dates]
+    day_loads = compute_day_loads(st.session_state.tasks, date_keys)
+    capacities = get_day_capacities(week_dates)
+
+    # 外部変更を反映した日は、このリランだけヘッダに 🔄 を付ける
+    refreshed_dates = st.session_state.refreshed_dates
+    st.session_state.refreshed_dates = set()
+    if refreshed_dates and hasattr(st, "toast"):
+        st.toast(f"🔄 他の場所での変更を反映しました（{len(refreshed_dates)}日分）")
+
     for i, (date, col, weekday) in enumerate(zip(week_dates, cols, weekdays)):
         ds = date.strftime("%Y-%m-%d")
+        refreshed_mark = "🔄 " if ds in refreshed_dates else ""
+        load, capacity = day_loads[ds], capacities[i]
+        overloaded = load > capacity
         with col:
             st.markdown(
-                f'<div class="dc-head day-head-{i}">'
+                f'<div class="dc-head day-head-{i}{" overloaded" if overloaded else ""}">'
                 f'  <div class="dc-name">{weekday}</div>'
-                f'  <div class="dc-date">{format_date_jp(date)}</div>'
+                f'  <div class="dc-date">{refreshed_mark}{format_date_jp(date)}</div>'
+                f'  <div class="dc-load">{"⚠️ " if overloaded else ""}{load:g} / {capacity:g} h</div>'
                 f'</div>',
                 unsafe_allow_html=True,
             )
@@ -675,6 +1665,13 @@ def main():
                     c1, c2 = st.columns([5, 1])
                     with c1:
                         st.markdown(f'<div class="task-title">{task.title}</div>', unsafe_allow_html=True)
+                        meta = []
+                        if task.estimate is not None:
+                            meta.append(f"⏱ {task.estimate:g}h")
+                        if task.pinned:
+                            meta.append("📌 固定")
+                        if meta:
+                            st.markdown(f'<div class="task-meta">{" ・ ".join(meta)}</div>', unsafe_allow_html=True)
                         if task.priority != "medium":
                             ptxt = {"high": "高", "medium": "中", "low": "低"}[task.priority]
                             st.markdown(f'<span class="{badge_cls}">{ptxt}</span>', unsafe_allow_html=True)
@@ -703,16 +1700,11 @@ def main():
                         for att in task.attachments:
                             if att["type"].startswith("image/"):
                                 if CLICKABLE_AVAILABLE:
-                                    clicked = clickable_images(
+                                    clicked = _COMPONENTS["clickable_images"](
                                         [att["data"]],
                                         titles=[att["name"]],
-                                        div_style={"display": "inline-block", "padding": "2px"},
-                                        img_style={
-                                            "margin": "4px",
-                                            "height": "110px",
-                                            "border": "1px solid #e5e7eb",
-                                            "border-radius": "6px",
-                                        },
+                                        div_style=THUMB_DIV_STYLE,
+                                        img_style=THUMB_IMG_STYLE,
                                         key=f"thumb_{task.id}_{att['id']}",
                                     )
                                     if clicked == 0:
@@ -720,6 +1712,8 @@ def main():
                                         st.rerun()
                                 else:
                                     try:
+                                        from PIL import Image  # 実際にデコードするときだけ読み込む
+
                                         b = base64.b64decode(att["data"].split(",")[1])
                                         img = Image.open(io.BytesIO(b))
                                         st.image(img, caption=att["name"], width=140)
@@ -746,6 +1740,12 @@ def main():
                 close_image_modal()
                 st.rerun()
 
+    # 外部変更の監視
+    watch_store_changes()
+
+    # 起動計測（描画の最後に確定させる）
+    render_perf_report(perf_slot)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file